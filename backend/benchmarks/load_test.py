@@ -0,0 +1,332 @@
+"""
+Benchmark offline da API: sobe o uvicorn com o FakeImageAgent (AGENT_TYPE=fake),
+dispara POST /generate-image em níveis fixos de concorrência e grava o resultado
+em JSON para comparar regressões entre commits.
+
+Uso (a partir de backend/):
+    python benchmarks/load_test.py --workers 1 2 --concurrency 1 8 32
+    python benchmarks/load_test.py --compare benchmarks/results/anterior.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+_METRIC_LINE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>[^}]*)\})? (?P<value>\S+)$')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))
+    return round(ordered[index], 4)
+
+
+# RSS do processo do servidor e de todos os workers (Linux, via /proc)
+def process_tree_rss(pid: int) -> int | None:
+    try:
+        total = 0
+        pending = [pid]
+        while pending:
+            current = pending.pop()
+            status = Path(f"/proc/{current}/status").read_text()
+            match = re.search(r"^VmRSS:\s+(\d+) kB", status, re.MULTILINE)
+            if match:
+                total += int(match.group(1)) * 1024
+            for children in Path(f"/proc/{current}/task").glob("*/children"):
+                pending.extend(int(child) for child in children.read_text().split())
+        return total
+    except OSError:
+        return None
+
+
+# Histograma do atraso do event loop, por pid do worker que respondeu o /metrics
+def parse_loop_lag(metrics_text: str) -> dict[str, dict]:
+    workers: dict[str, dict] = {}
+    for line in metrics_text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if not match or not match.group("name").startswith("isoscape_event_loop_lag_seconds"):
+            continue
+        name, value, labels = match.group("name"), float(match.group("value")), match.group("labels") or ""
+        pid_match = re.search(r'pid="([^"]*)"', labels)
+        if pid_match is None:
+            continue
+        series = workers.setdefault(pid_match.group(1), {"buckets": {}, "sum": 0.0, "count": 0.0})
+        if name.endswith("_bucket"):
+            bound = re.search(r'le="([^"]+)"', labels).group(1)
+            series["buckets"][float("inf") if bound == "+Inf" else float(bound)] = value
+        elif name.endswith("_sum"):
+            series["sum"] = value
+        elif name.endswith("_count"):
+            series["count"] = value
+    return workers
+
+
+# Cada GET /metrics cai em um worker qualquer: lê até ter visto todos os pids
+def scrape_loop_lag(base_url: str, workers: int, max_attempts: int = 50) -> dict[str, dict] | None:
+    seen: dict[str, dict] = {}
+    for _ in range(max_attempts * workers):
+        for pid, series in parse_loop_lag(httpx.get(f"{base_url}/metrics").text).items():
+            seen.setdefault(pid, series)
+        if len(seen) >= workers:
+            return seen
+    return None
+
+
+def _histogram_summary(buckets: dict[float, float], total: float, count: float) -> dict[str, float | None]:
+    if count <= 0:
+        return {"mean_seconds": None, "p99_bucket_seconds": None}
+    p99_bound = None
+    for bound in sorted(buckets):
+        if buckets[bound] >= 0.99 * count:
+            p99_bound = bound
+            break
+    return {"mean_seconds": round(total / count, 6), "p99_bucket_seconds": p99_bound}
+
+
+# Diferença entre duas leituras, worker a worker; o total soma os histogramas dos workers
+def loop_lag_delta(before: dict[str, dict] | None, after: dict[str, dict] | None) -> dict:
+    if before is None or after is None or before.keys() != after.keys():
+        return {"mean_seconds": None, "p99_bucket_seconds": None, "per_worker": None}
+    merged_buckets: dict[float, float] = {}
+    merged_sum = merged_count = 0.0
+    per_worker = {}
+    for pid in sorted(after):
+        buckets = {
+            bound: value - before[pid]["buckets"].get(bound, 0)
+            for bound, value in after[pid]["buckets"].items()
+        }
+        total = after[pid]["sum"] - before[pid]["sum"]
+        count = after[pid]["count"] - before[pid]["count"]
+        per_worker[pid] = _histogram_summary(buckets, total, count)
+        for bound, value in buckets.items():
+            merged_buckets[bound] = merged_buckets.get(bound, 0) + value
+        merged_sum += total
+        merged_count += count
+    return {**_histogram_summary(merged_buckets, merged_sum, merged_count), "per_worker": per_worker}
+
+
+class Server:
+
+    def __init__(self, workers: int, env: dict[str, str]):
+        self.workers = workers
+        self.env = env
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.process: subprocess.Popen | None = None
+
+    def __enter__(self) -> "Server":
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1",
+                "--port", str(self.port),
+                "--workers", str(self.workers),
+                "--log-level", "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **self.env},
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError("Server did not become healthy in 30s")
+
+    def __exit__(self, *exc) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+async def run_level(base_url: str, concurrency: int, total_requests: int, run_id: str) -> dict:
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    next_index = 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal next_index
+        while next_index < total_requests:
+            index = next_index
+            next_index += 1
+            # Prompts únicos para não medir o cache
+            prompt = f"benchmark {run_id} c{concurrency} #{index}"
+            started_at = time.perf_counter()
+            try:
+                response = await client.post("/generate-image", json={"prompt": prompt})
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started_at
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "200":
+                latencies.append(elapsed)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "statuses": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(total_requests / elapsed, 2),
+        "successful_per_second": round(len(latencies) / elapsed, 2),
+        "latency_seconds": {
+            "mean": round(statistics.fmean(latencies), 4) if latencies else None,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+        },
+    }
+
+
+def benchmark(args: argparse.Namespace) -> dict:
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    results = []
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {
+            "AGENT_TYPE": "fake",
+            "FAKE_AGENT_LATENCY": str(args.latency),
+            "FAKE_AGENT_LATENCY_SIGMA": str(args.latency_sigma),
+            "FAKE_AGENT_ERROR_RATE": str(args.error_rate),
+            "FAKE_AGENT_IMAGE_BYTES": str(args.image_bytes),
+            "GENERATION_CACHE_DIR": os.path.join(data_dir, "cache"),
+            "IMAGE_STORE_DIR": os.path.join(data_dir, "images"),
+            "CITY_STATS_PATH": os.path.join(data_dir, "city_stats.json"),
+            **dict(item.split("=", 1) for item in args.env),
+        }
+
+        for workers in args.workers:
+            with Server(workers, env) as server:
+                asyncio.run(run_level(server.base_url, 1, args.warmup, f"{run_id}-warmup"))
+                for concurrency in args.concurrency:
+                    lag_before = scrape_loop_lag(server.base_url, workers)
+                    rss_before = process_tree_rss(server.process.pid)
+
+                    level = asyncio.run(
+                        run_level(server.base_url, concurrency, args.requests, f"{run_id}-w{workers}")
+                    )
+
+                    rss_after = process_tree_rss(server.process.pid)
+                    lag_after = scrape_loop_lag(server.base_url, workers)
+                    level["workers"] = workers
+                    level["event_loop_lag"] = loop_lag_delta(lag_before, lag_after)
+                    level["rss_bytes"] = rss_after
+                    level["rss_growth_per_request_bytes"] = (
+                        round((rss_after - rss_before) / args.requests)
+                        if rss_before is not None and rss_after is not None else None
+                    )
+                    results.append(level)
+                    print(
+                        f"workers={workers} concurrency={concurrency} "
+                        f"req/s={level['requests_per_second']} "
+                        f"p50={level['latency_seconds']['p50']} p99={level['latency_seconds']['p99']} "
+                        f"statuses={level['statuses']}"
+                    )
+
+    return {
+        "run_id": run_id,
+        "commit": git_commit(),
+        "config": {
+            "latency": args.latency,
+            "latency_sigma": args.latency_sigma,
+            "error_rate": args.error_rate,
+            "image_bytes": args.image_bytes,
+            "requests_per_level": args.requests,
+            "env": args.env,
+        },
+        "results": results,
+    }
+
+
+def compare(previous: dict, current: dict) -> None:
+    print(f"\nComparing {previous.get('commit')} -> {current.get('commit')}")
+    old_levels = {(r["workers"], r["concurrency"]): r for r in previous["results"]}
+    for level in current["results"]:
+        old = old_levels.get((level["workers"], level["concurrency"]))
+        if old is None:
+            continue
+        for label, old_value, new_value in [
+            ("req/s", old["requests_per_second"], level["requests_per_second"]),
+            ("p95", old["latency_seconds"]["p95"], level["latency_seconds"]["p95"]),
+            ("p99", old["latency_seconds"]["p99"], level["latency_seconds"]["p99"]),
+        ]:
+            if old_value and new_value is not None:
+                change = (new_value - old_value) / old_value * 100
+                print(
+                    f"workers={level['workers']} concurrency={level['concurrency']} "
+                    f"{label}: {old_value} -> {new_value} ({change:+.1f}%)"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test with a simulated agent")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="Median simulated model latency (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Lognormal sigma (0 = fixed)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--image-bytes", type=int, default=1_500_000)
+    parser.add_argument("--env", nargs="*", default=[], help="Extra server env, e.g. MAX_CONCURRENT_GENERATIONS=64")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="Previous result JSON to compare with")
+    args = parser.parse_args()
+
+    report = benchmark(args)
+
+    output = args.output or RESULTS_DIR / f"{report['run_id']}-{report['commit'] or 'nocommit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
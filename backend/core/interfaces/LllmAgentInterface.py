@@ -9,4 +9,13 @@ class LlmAgentInterface(ABC):
     async def generate_content(self, prompt: str) -> LlmAgentResponse:
         pass
 
+    # Identifica modelo e configuração, usado para compor a chave de cache
+    def config_fingerprint(self) -> str:
+        return type(self).__name__
+
+    async def warm_up(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
 
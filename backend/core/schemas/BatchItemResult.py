@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Any
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: str
+    attempts: int
+    latency_seconds: float
+    data: dict[str, Any] | None = None
+    error: str | None = None
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, model_validator
+
+
+class BatchRequest(BaseModel):
+    prompts: list[str] = []
+    cities: list[str] = []
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "BatchRequest":
+        if not self.prompts and not self.cities:
+            raise ValueError("Provide at least one prompt or city.")
+        return self
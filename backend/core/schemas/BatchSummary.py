@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class BatchSummary(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    attempts: int
+    elapsed_seconds: float
+    items_per_minute: float
@@ -0,0 +1,25 @@
+from enum import Enum
+from pydantic import BaseModel
+from core.schemas.UserResponse import UserResponse
+
+
+class JobStage(str, Enum):
+    QUEUED = "queued"
+    UPSTREAM_CALL = "upstream_call"
+    DECODE = "decode"
+    PERSIST = "persist"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    job_id: str
+    stage: JobStage
+    created_at: float
+    updated_at: float
+    result: UserResponse | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.stage in (JobStage.DONE, JobStage.FAILED)
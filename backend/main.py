@@ -1,13 +1,81 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi import APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from pathlib import Path
+from src.composition.AppBuilder import (
+    build_llm_agent,
+    build_generation_cache,
+    build_image_store,
+    build_job_manager,
+    build_batch_scheduler,
+    build_isometric_service,
+    generation_limiter,
+)
+from src.config.ServerConfig import server_config
 from src.controllers.ImageGenerationController import router
+from src.controllers.ImageController import router as image_router
+from src.controllers.JobController import router as job_router
+from src.controllers.BatchController import router as batch_router
+from src.controllers.MetricsController import router as metrics_router
+from src.controllers.CityController import router as city_router
+from src.handlers.ImageGenerationHandler import ImageGenerationHandler
+from src.metrics.Metrics import metrics, GENERATIONS_IN_FLIGHT, GENERATIONS_QUEUED, JOBS_QUEUED, CACHE_EVENTS
+from src.metrics.MetricsMiddleware import MetricsMiddleware
+from src.metrics.EventLoopMonitor import EventLoopMonitor
 
 load_dotenv()
 
-app = FastAPI(title="IsoScape API")
+
+def register_metrics_collectors(app: FastAPI) -> None:
+    def collect() -> None:
+        GENERATIONS_IN_FLIGHT.set(generation_limiter.in_flight)
+        GENERATIONS_QUEUED.set(generation_limiter.queued)
+        JOBS_QUEUED.set(app.state.job_manager.queued())
+        if app.state.generation_cache is not None:
+            for event, total in app.state.generation_cache.stats.items():
+                CACHE_EVENTS.set_total(total, event=event)
+
+    metrics.add_collector(collect)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.llm_agent = build_llm_agent()
+    app.state.image_store = build_image_store()
+    app.state.generation_cache = build_generation_cache(app.state.image_store)
+    handler = ImageGenerationHandler(
+        image_generation_agent=app.state.llm_agent,
+        image_store=app.state.image_store,
+        generation_cache=app.state.generation_cache,
+    )
+    app.state.job_manager = build_job_manager(handler)
+    app.state.isometric_service = build_isometric_service(handler, app.state.job_manager)
+    app.state.batch_scheduler = build_batch_scheduler(
+        llm_agent=app.state.llm_agent,
+        image_store=app.state.image_store,
+        generation_cache=app.state.generation_cache,
+    )
+    register_metrics_collectors(app)
+    app.state.event_loop_monitor = EventLoopMonitor(interval=server_config["event_loop_lag_interval"])
+    await app.state.event_loop_monitor.start()
+    await app.state.llm_agent.warm_up()
+    await app.state.job_manager.start()
+    await app.state.isometric_service.start()
+    try:
+        yield
+    finally:
+        await app.state.isometric_service.stop()
+        await app.state.event_loop_monitor.stop()
+        await app.state.job_manager.stop()
+        await app.state.llm_agent.close()
+        metrics.clear_collectors()
+
+
+app = FastAPI(title="IsoScape API", lifespan=lifespan)
+
+app.add_middleware(MetricsMiddleware, server_timing=server_config["server_timing_enabled"])
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,4 +85,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
+app.include_router(image_router)
+app.include_router(job_router)
+app.include_router(batch_router)
+app.include_router(metrics_router)
+app.include_router(city_router)
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+import time
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Callable, Iterator
+from core.schemas.UserRequest import UserRequest
+from src.handlers.ImageGenerationHandler import ImageGenerationHandler
+from src.metrics.Metrics import PRERENDERS
+
+try:
+    import fcntl
+except ImportError:
+    # Sem fcntl (Windows) não há trava entre processos: vale só com um worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ISOMETRIC_PROMPT_TEMPLATE = """
+CITY = [CITY]
+
+Crie uma cena isométrica em miniatura 3D no estilo cartoon, vista em ângulo de 45°, 
+representando de forma clara a cidade de [CITY]. Inclua marcos e atrações turísticas icônicas.
+
+Use texturas suaves e refinadas, com materiais PBR realistas, iluminação natural delicada 
+e sombras suaves, refletindo as condições climáticas atuais da cidade para criar uma atmosfera imersiva. 
+Mantenha a composição limpa e minimalista, com fundo em cor sólida.
+
+No topo central da imagem, coloque o título "[CITY]" em texto médio e negrito, podendo sobrepor levemente o topo das edificações.
+
+A imagem deve ter proporção quadrada, 1080 × 1080 pixels.
+"""
+
+# Preposições e artigos que ficam em minúsculas no nome exibido ("Rio de Janeiro")
+LOWERCASE_WORDS = {"de", "da", "do", "das", "dos", "e", "di", "del", "la", "le", "of", "the", "upon"}
+
+
+def city_key(city: str) -> str:
+    # Chave sem acentos e sem caixa: "sao paulo" e "São  Paulo" são a mesma cidade
+    decomposed = unicodedata.normalize("NFKD", city)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
+
+
+def _is_particle(word: str, index: int) -> bool:
+    return index > 0 and word.lower() in LOWERCASE_WORDS
+
+
+def format_city_name(city: str) -> str:
+    words = unicodedata.normalize("NFC", city).split()
+    return " ".join(
+        word.lower() if _is_particle(word, index)
+        # Palavras todas em maiúsculas viram "Paulo"; caixa mista ("McAllen") é mantida
+        else word.capitalize() if word.isupper()
+        else word[:1].upper() + word[1:]
+        for index, word in enumerate(words)
+    )
+
+
+def city_name_score(name: str) -> tuple[int, int]:
+    # Grafias melhores têm mais acentos ("São Paulo" > "Sao Paulo") e caixa de nome próprio
+    accents = sum(1 for c in unicodedata.normalize("NFKD", name) if unicodedata.combining(c))
+    well_cased = sum(
+        1 for index, word in enumerate(name.split())
+        if (word.islower() if _is_particle(word, index) else word[:1].isupper() and not word[1:].isupper())
+    )
+    return accents, well_cased
+
+
+def preferred_city_name(current: str | None, candidate: str) -> str:
+    if current is None or city_name_score(candidate) > city_name_score(current):
+        return candidate
+    return current
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # Fechar o arquivo libera a trava
+        yield
+
+
+class IsometricService:
+
+    def __init__(
+        self,
+        handler: ImageGenerationHandler,
+        stats_path: str,
+        max_tracked_cities: int,
+        prerender_enabled: bool,
+        prerender_top_n: int,
+        prerender_min_requests: int,
+        prerender_budget_per_day: int,
+        prerender_interval: float,
+        is_upstream_idle: Callable[[], bool],
+    ):
+        self.handler = handler
+        self.stats_path = Path(stats_path)
+        self.max_tracked_cities = max_tracked_cities
+        self.prerender_enabled = prerender_enabled
+        self.prerender_top_n = prerender_top_n
+        self.prerender_min_requests = prerender_min_requests
+        self.prerender_budget_per_day = prerender_budget_per_day
+        self.prerender_interval = prerender_interval
+        self.is_upstream_idle = is_upstream_idle
+        # Visão mesclada das estatísticas de todos os workers, relida a cada ciclo
+        self.request_counts: Counter[str] = Counter()
+        self.display_names: dict[str, str] = {}
+        self._prerendered_at: list[float] = []
+        # Pedidos e pré-renderizações deste worker ainda não gravados no arquivo
+        self._pending_counts: Counter[str] = Counter()
+        self._pending_prerenders: list[float] = []
+        self._prerender_lock: IO | None = None
+        self._task: asyncio.Task | None = None
+
+    def normalize_city(self, city: str) -> str:
+        # A melhor grafia vista para uma cidade vira o nome canônico, assim
+        # "sao paulo" e "São Paulo" geram o mesmo prompt (e a mesma chave de cache)
+        key = city_key(city)
+        if not key:
+            raise ValueError("City name is empty.")
+        return preferred_city_name(self.display_names.get(key), format_city_name(city))
+
+    def build_prompt(self, city: str) -> str:
+        return ISOMETRIC_PROMPT_TEMPLATE.replace("[CITY]", self.normalize_city(city))
+
+    def record_request(self, city: str) -> str:
+        key = city_key(city)
+        name = self.normalize_city(city)
+        self.display_names[key] = name
+        self.request_counts[key] += 1
+        self._pending_counts[key] += 1
+        if len(self.request_counts) > self.max_tracked_cities:
+            self._prune_counts(self.request_counts, self.display_names)
+            for dropped in self._pending_counts.keys() - self.request_counts.keys():
+                del self._pending_counts[dropped]
+        return name
+
+    def _prune_counts(self, counts: Counter[str], names: dict[str, str]) -> None:
+        # Descarta as cidades menos pedidas, com folga para não podar a cada pedido novo
+        if len(counts) > self.max_tracked_cities:
+            keep = max(1, self.max_tracked_cities * 9 // 10)
+            for key, _ in counts.most_common()[keep:]:
+                del counts[key]
+        for key in names.keys() - counts.keys():
+            del names[key]
+
+    def popular_cities(self, limit: int) -> list[dict[str, str | int]]:
+        return [
+            {"city": self.display_names[key], "requests": count}
+            for key, count in self.request_counts.most_common(limit)
+        ]
+
+    async def start(self) -> None:
+        await self._sync_stats()
+        if self.prerender_enabled and self.handler.generation_cache is None:
+            logger.warning("Pre-rendering disabled: generation cache is off.")
+        self._task = asyncio.create_task(self._background_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._sync_stats()
+        if self._prerender_lock is not None:
+            self._prerender_lock.close()
+            self._prerender_lock = None
+
+    def _budget_left(self) -> int:
+        cutoff = time.time() - 24 * 3600
+        used = sum(1 for t in [*self._prerendered_at, *self._pending_prerenders] if t >= cutoff)
+        return self.prerender_budget_per_day - used
+
+    async def _background_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.prerender_interval)
+            try:
+                await self._sync_stats()
+                if await self._is_prerender_worker():
+                    await self._prerender_next()
+            except Exception as e:
+                logger.warning("Pre-render pass failed: %s", e)
+
+    async def _is_prerender_worker(self) -> bool:
+        # Com uvicorn --workers N, só o worker que segura a trava pré-renderiza; os demais
+        # tentam de novo a cada ciclo, para assumir se ele cair
+        if not self.prerender_enabled or self.handler.generation_cache is None:
+            return False
+        if self._prerender_lock is None:
+            self._prerender_lock = await asyncio.to_thread(self._try_prerender_lock)
+        return self._prerender_lock is not None
+
+    def _try_prerender_lock(self) -> IO | None:
+        path = self.stats_path.with_suffix(".prerender.lock")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(path, "a")
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    async def _prerender_next(self) -> None:
+        # Gera no máximo uma cidade por ciclo, só com o upstream ocioso e dentro do orçamento
+        if self._budget_left() <= 0 or not self.is_upstream_idle():
+            return
+        for key, count in self.request_counts.most_common(self.prerender_top_n):
+            # Cidades com poucos pedidos (ou nomes inventados) não gastam o orçamento
+            if count < self.prerender_min_requests:
+                break
+            prompt = self.build_prompt(self.display_names[key])
+            if await self.handler.is_cached(prompt):
+                continue
+            self._pending_prerenders.append(time.time())
+            try:
+                await self.handler.generate_image(UserRequest(prompt=prompt))
+                PRERENDERS.inc(status="success")
+            except Exception:
+                PRERENDERS.inc(status="error")
+                raise
+            return
+
+    async def _sync_stats(self) -> None:
+        pending_counts, self._pending_counts = self._pending_counts, Counter()
+        pending_prerenders, self._pending_prerenders = self._pending_prerenders, []
+        try:
+            counts, names, prerendered_at = await asyncio.to_thread(
+                self._merge_stats, pending_counts, dict(self.display_names), pending_prerenders
+            )
+        except OSError as e:
+            self._pending_counts.update(pending_counts)
+            self._pending_prerenders.extend(pending_prerenders)
+            logger.warning("Could not save city stats: %s", e)
+            return
+
+        # Pedidos registrados durante a gravação entram na próxima sincronização
+        counts.update(self._pending_counts)
+        for key in self._pending_counts:
+            if key in self.display_names:
+                names[key] = preferred_city_name(names.get(key), self.display_names[key])
+        self.request_counts = counts
+        self.display_names = names
+        self._prerendered_at = prerendered_at
+
+    def _merge_stats(
+        self,
+        pending_counts: Counter[str],
+        local_names: dict[str, str],
+        pending_prerenders: list[float],
+    ) -> tuple[Counter[str], dict[str, str], list[float]]:
+        # Lê, soma os pedidos deste worker e regrava sob trava: os workers não se sobrescrevem
+        with _file_lock(self.stats_path.with_suffix(".lock")):
+            try:
+                stats = json.loads(self.stats_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                stats = {}
+            counts = Counter(stats.get("counts", {}))
+            counts.update(pending_counts)
+            names = dict(stats.get("display_names", {}))
+            for key, name in local_names.items():
+                names[key] = preferred_city_name(names.get(key), name)
+            self._prune_counts(counts, names)
+            cutoff = time.time() - 24 * 3600
+            prerendered_at = sorted(
+                t for t in [*stats.get("prerendered_at", []), *pending_prerenders] if t >= cutoff
+            )
+            if pending_counts or pending_prerenders:
+                content = {"counts": counts, "display_names": names, "prerendered_at": prerendered_at}
+                self._write_stats(json.dumps(content, ensure_ascii=False))
+        return counts, names, prerendered_at
+
+    def _write_stats(self, content: str) -> None:
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.stats_path.with_suffix(".tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        tmp_path.replace(self.stats_path)
@@ -0,0 +1,90 @@
+import asyncio
+import base64
+import math
+import os
+import random
+import struct
+import uuid
+import zlib
+from core.interfaces.LllmAgentInterface import LlmAgentInterface
+from core.schemas.LlmAgentResponse import LlmAgentResponse
+from src.metrics.Metrics import span
+
+
+# PNG 1x1 transparente, usado quando nenhum tamanho de imagem é pedido
+_TINY_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+# PNG RGB válido com ruído aleatório (incompressível), com aproximadamente size_bytes
+def _noise_png(size_bytes: int) -> bytes:
+    side = max(1, math.ceil(math.sqrt(size_bytes / 3)))
+    rows = b"".join(b"\x00" + os.urandom(side * 3) for _ in range(side))
+    header = struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0)
+    return (
+        _PNG_SIGNATURE
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(rows, 0))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+class FakeUpstreamError(Exception):
+    def __init__(self, message: str, code: int = 503):
+        super().__init__(message)
+        self.code = code
+
+
+# Agente local que simula a latência do modelo, para testes de carga sem custo.
+# Com latency_sigma > 0 a latência segue uma lognormal com mediana latency_seconds;
+# caso contrário é latency_seconds mais um jitter uniforme.
+class FakeImageAgent(LlmAgentInterface):
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        latency_sigma: float = 0.0,
+        image_size_bytes: int = 0,
+    ):
+        self.latency_seconds = latency_seconds
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.latency_sigma = latency_sigma
+        self._base_image = _noise_png(image_size_bytes) if image_size_bytes > 0 else _TINY_PNG
+
+    def _sample_latency(self) -> float:
+        if self.latency_sigma > 0 and self.latency_seconds > 0:
+            return random.lognormvariate(math.log(self.latency_seconds), self.latency_sigma)
+        return self.latency_seconds + random.uniform(0, self.latency_jitter)
+
+    def _unique_image(self) -> bytes:
+        # Um chunk tEXt com uuid antes do IEND torna cada imagem única (hash diferente)
+        # sem gerar todo o ruído de novo
+        marker = _png_chunk(b"tEXt", b"fake\x00" + uuid.uuid4().hex.encode("ascii"))
+        return self._base_image[:-12] + marker + self._base_image[-12:]
+
+    async def generate_content(self, prompt: str) -> LlmAgentResponse:
+        with span("upstream_call"):
+            delay = self._sample_latency()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if random.random() < self.error_rate:
+                raise FakeUpstreamError("Simulated upstream failure")
+
+        return LlmAgentResponse(
+            status="success",
+            payload={},
+            data={
+                "image_bytes": self._unique_image(),
+                "mime_type": "image/png",
+                "text": f"Fake image for prompt of {len(prompt)} chars",
+            },
+        )
@@ -1,10 +1,24 @@
+import os
+from dotenv import load_dotenv
 from google.genai import types
 
+load_dotenv()
+
 # Config global para toda a requisição
 gemini_config = {
     "model_name": "gemini-3-pro-image-preview",
-    # "model_name": "gemini-2.5-flash-image",
+    # Modelos mais baratos/rápidos usados quando o principal falha ou estoura o prazo
+    "fallback_model_names": ["gemini-2.5-flash-image"],
     "content_config": types.GenerateContentConfig(
         temperature=1.0,
     )
 }
+
+# Pool de conexões HTTP compartilhado durante toda a vida do processo
+gemini_http_config = {
+    "max_connections": int(os.getenv("GEMINI_HTTP_MAX_CONNECTIONS", "20")),
+    "max_keepalive_connections": int(os.getenv("GEMINI_HTTP_MAX_KEEPALIVE", "10")),
+    "keepalive_expiry": float(os.getenv("GEMINI_HTTP_KEEPALIVE_EXPIRY", "120")),
+    "connect_timeout": float(os.getenv("GEMINI_HTTP_CONNECT_TIMEOUT", "10")),
+    "timeout": float(os.getenv("GEMINI_HTTP_TIMEOUT", "120")),
+}
@@ -1,23 +1,66 @@
 import os
-import base64
-import uuid
+import json
+import logging
+import time
+import httpx
 from google import genai
+from google.genai import types
 from core.interfaces.LllmAgentInterface import LlmAgentInterface
 from core.schemas.LlmAgentResponse import LlmAgentResponse
-from src.LlmAgents.gemini.GeminiConfig import gemini_config
+from src.LlmAgents.gemini.GeminiConfig import gemini_config, gemini_http_config
+from src.metrics.Metrics import span, UPSTREAM_LATENCY
+
+logger = logging.getLogger(__name__)
 
 
 class GeminiImageAgent(LlmAgentInterface):
-    def __init__(self, api_key: str):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: str, model_name: str | None = None):
         self.gemini_config = gemini_config
+        self.model_name = model_name or gemini_config["model_name"]
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=gemini_http_config["max_connections"],
+                max_keepalive_connections=gemini_http_config["max_keepalive_connections"],
+                keepalive_expiry=gemini_http_config["keepalive_expiry"],
+            ),
+            timeout=httpx.Timeout(
+                gemini_http_config["timeout"],
+                connect=gemini_http_config["connect_timeout"],
+            ),
+        )
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=int(gemini_http_config["timeout"] * 1000),
+                httpx_async_client=self.http_client,
+            ),
+        )
+
+    def config_fingerprint(self) -> str:
+        return json.dumps([
+            self.model_name,
+            self.gemini_config["content_config"].model_dump(mode="json", exclude_none=True),
+        ], sort_keys=True)
+
+    async def warm_up(self) -> None:
+        # Abre a conexão TLS antes da primeira requisição do usuário
+        try:
+            await self.client.aio.models.get(model=self.model_name)
+        except Exception as e:
+            logger.warning("Gemini warm-up failed: %s", e)
+
+    async def close(self) -> None:
+        await self.http_client.aclose()
 
     async def generate_content(self, prompt: str) -> LlmAgentResponse:
-        response = self.client.models.generate_content(
-            model=self.gemini_config["model_name"],
-            contents=[prompt],
-            config=self.gemini_config["content_config"]
-        )
+        started_at = time.perf_counter()
+        with span("upstream_call"):
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=[prompt],
+                config=self.gemini_config["content_config"]
+            )
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started_at, model=self.model_name)
 
         if not response.candidates:
             raise ValueError("Empty response from Gemini.")
@@ -25,24 +68,26 @@ class GeminiImageAgent(LlmAgentInterface):
         primary_candidate = response.candidates[0]
         parts = primary_candidate.content.parts if primary_candidate.content else []
 
-        image_base64 = None
+        image_bytes = None
+        mime_type = None
         text = None
 
-        for part in parts:
-            inline_data = getattr(part, "inline_data", None)
-            data_bytes = getattr(inline_data, "data", None)
-            if isinstance(data_bytes, bytes):
-                image_base64 = base64.b64encode(data_bytes).decode("utf-8")
-                file_path = f"logos/generated_image_{uuid.uuid4()}.png"
-                with open(file_path, "wb") as f:
-                    f.write(data_bytes)
-            text = getattr(part, "text", None)
+        # A imagem é devolvida em bytes; a persistência fica com o handler
+        with span("response_scan"):
+            for part in parts:
+                inline_data = getattr(part, "inline_data", None)
+                data_bytes = getattr(inline_data, "data", None)
+                if isinstance(data_bytes, bytes):
+                    image_bytes = data_bytes
+                    mime_type = getattr(inline_data, "mime_type", None) or "image/png"
+                text = getattr(part, "text", None) or text
 
         return LlmAgentResponse(
             status="success",
             payload={},
             data={
-                "image_base64": image_base64,
+                "image_bytes": image_bytes,
+                "mime_type": mime_type,
                 "text": text,
             },
         )
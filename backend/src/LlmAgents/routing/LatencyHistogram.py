@@ -0,0 +1,22 @@
+import math
+from collections import deque
+
+
+# Janela deslizante das latências mais recentes de um modelo
+class LatencyHistogram:
+
+    def __init__(self, window_size: int):
+        self._samples: deque[float] = deque(maxlen=window_size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
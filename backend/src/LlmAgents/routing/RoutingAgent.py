@@ -0,0 +1,149 @@
+import asyncio
+import copy
+import json
+import logging
+import time
+from contextlib import AbstractAsyncContextManager, nullcontext
+from typing import Callable
+from core.interfaces.LllmAgentInterface import LlmAgentInterface
+from core.schemas.LlmAgentResponse import LlmAgentResponse
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimitExceeded
+from src.LlmAgents.routing.LatencyHistogram import LatencyHistogram
+from src.metrics.Metrics import (
+    ROUTE_CALLS,
+    ROUTE_FAILURES,
+    ROUTE_FALLBACKS,
+    ROUTE_HEDGE_DELAY,
+    ROUTE_HEDGES,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Tenta as rotas em ordem (primária, depois fallbacks). Em cada rota, se a resposta
+# passar do percentil de latência observado, dispara uma segunda requisição igual e
+# fica com a que terminar primeiro. Cada chamada ao modelo (inclusive hedges) pega
+# sua própria vaga em call_slot antes de contar prazo e latência.
+class RoutingAgent(LlmAgentInterface):
+    def __init__(
+        self,
+        routes: list[tuple[str, LlmAgentInterface]],
+        attempt_timeout: float,
+        hedge_enabled: bool,
+        hedge_percentile: float,
+        hedge_min_samples: int,
+        hedge_default_delay: float,
+        latency_window: int,
+    ):
+        if not routes:
+            raise ValueError("RoutingAgent needs at least one route.")
+        self.routes = routes
+        self.attempt_timeout = attempt_timeout
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay = hedge_default_delay
+        self.latencies = {name: LatencyHistogram(latency_window) for name, _ in routes}
+        self.call_slot: Callable[[], AbstractAsyncContextManager[None]] = nullcontext
+        self.has_free_slot: Callable[[], bool] = lambda: True
+
+    async def generate_content(self, prompt: str) -> LlmAgentResponse:
+        last_error: Exception | None = None
+        for index, (name, agent) in enumerate(self.routes):
+            try:
+                response = await self._call_route(name, agent, prompt)
+                response.payload["route"] = name
+                response.payload["fallback"] = index > 0
+                if index > 0:
+                    ROUTE_FALLBACKS.inc(route=name)
+                return response
+            except ConcurrencyLimitExceeded:
+                # As outras rotas disputam o mesmo limitador: não adianta tentar
+                raise
+            except Exception as e:
+                ROUTE_FAILURES.inc(route=name)
+                logger.warning("Route %s failed, trying next: %r", name, e)
+                last_error = e
+        raise last_error
+
+    def with_call_slot(
+        self,
+        call_slot: Callable[[], AbstractAsyncContextManager[None]],
+        has_free_slot: Callable[[], bool],
+    ) -> "RoutingAgent":
+        # Cópia com outro controle de vagas (limitador, cota), compartilhando o histórico de latência
+        routed = copy.copy(self)
+        routed.call_slot = call_slot
+        routed.has_free_slot = has_free_slot
+        return routed
+
+    def hedge_delay(self, name: str) -> float | None:
+        if not self.hedge_enabled:
+            return None
+        histogram = self.latencies[name]
+        if histogram.count() < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return histogram.percentile(self.hedge_percentile)
+
+    async def _timed_call(self, name: str, agent: LlmAgentInterface, prompt: str) -> LlmAgentResponse:
+        started_at = time.monotonic()
+        response = await agent.generate_content(prompt)
+        # Só chamadas concluídas entram no histograma; as canceladas não têm latência real
+        self.latencies[name].record(time.monotonic() - started_at)
+        return response
+
+    async def _hedged_call(self, name: str, agent: LlmAgentInterface, prompt: str) -> LlmAgentResponse:
+        async with self.call_slot():
+            return await self._timed_call(name, agent, prompt)
+
+    async def _call_route(self, name: str, agent: LlmAgentInterface, prompt: str) -> LlmAgentResponse:
+        ROUTE_CALLS.inc(route=name)
+        hedge_delay = self.hedge_delay(name)
+        if hedge_delay is not None:
+            ROUTE_HEDGE_DELAY.set(hedge_delay, route=name)
+
+        # Prazo e hedge contam só depois da vaga: espera na fila não é lentidão do modelo
+        async with self.call_slot():
+            deadline = time.monotonic() + self.attempt_timeout
+            pending = {asyncio.create_task(self._timed_call(name, agent, prompt))}
+            hedged = False
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError(f"Route {name} exceeded {self.attempt_timeout}s")
+
+                    wait_for = remaining
+                    if not hedged and hedge_delay is not None:
+                        wait_for = min(remaining, hedge_delay)
+                    done, pending = await asyncio.wait(
+                        pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                    if done and not pending:
+                        # Todas as tentativas desta rota falharam
+                        raise done.pop().exception()
+
+                    if not done and not hedged and hedge_delay is not None and time.monotonic() < deadline:
+                        hedged = True
+                        # Sem vaga livre o hedge só ocuparia a fila de quem ainda não foi atendido
+                        if self.has_free_slot():
+                            ROUTE_HEDGES.inc(route=name)
+                            pending.add(asyncio.create_task(self._hedged_call(name, agent, prompt)))
+            finally:
+                # Cancela a requisição perdedora (ou todas, em caso de timeout) antes de soltar a vaga
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def config_fingerprint(self) -> str:
+        return json.dumps([agent.config_fingerprint() for _, agent in self.routes])
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(*(agent.warm_up() for _, agent in self.routes))
+
+    async def close(self) -> None:
+        await asyncio.gather(*(agent.close() for _, agent in self.routes))
@@ -0,0 +1,22 @@
+from core.interfaces.LllmAgentInterface import LlmAgentInterface
+from core.schemas.LlmAgentResponse import LlmAgentResponse
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimiter
+
+
+class ConcurrencyLimitedAgent(LlmAgentInterface):
+    def __init__(self, agent: LlmAgentInterface, limiter: ConcurrencyLimiter):
+        self.agent = agent
+        self.limiter = limiter
+
+    async def generate_content(self, prompt: str) -> LlmAgentResponse:
+        async with self.limiter.acquire():
+            return await self.agent.generate_content(prompt)
+
+    def config_fingerprint(self) -> str:
+        return self.agent.config_fingerprint()
+
+    async def warm_up(self) -> None:
+        await self.agent.warm_up()
+
+    async def close(self) -> None:
+        await self.agent.close()
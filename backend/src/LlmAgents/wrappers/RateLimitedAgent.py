@@ -0,0 +1,28 @@
+from core.interfaces.LllmAgentInterface import LlmAgentInterface
+from core.schemas.LlmAgentResponse import LlmAgentResponse
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimitExceeded
+from src.scheduling.TokenBucket import TokenBucket
+
+
+class RateLimitedAgent(LlmAgentInterface):
+    def __init__(self, agent: LlmAgentInterface, token_bucket: TokenBucket):
+        self.agent = agent
+        self.token_bucket = token_bucket
+
+    async def generate_content(self, prompt: str) -> LlmAgentResponse:
+        await self.token_bucket.acquire()
+        try:
+            return await self.agent.generate_content(prompt)
+        except ConcurrencyLimitExceeded:
+            # O limitador recusou antes de chamar o modelo: a cota não foi usada
+            self.token_bucket.refund()
+            raise
+
+    def config_fingerprint(self) -> str:
+        return self.agent.config_fingerprint()
+
+    async def warm_up(self) -> None:
+        await self.agent.warm_up()
+
+    async def close(self) -> None:
+        await self.agent.close()
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable
+from core.schemas.Job import JobStage
+from core.schemas.LlmAgentResponse import LlmAgentResponse
+
+StageCallback = Callable[[JobStage], None]
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", prompt).split())
+
+
+def generation_cache_key(prompt: str, agent_fingerprint: str) -> str:
+    raw = json.dumps([normalize_prompt(prompt), agent_fingerprint], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Chamada em andamento para uma chave: cada estágio é repassado a todos que a aguardam
+class _InFlightLoad:
+
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.stage: JobStage | None = None
+        self.listeners: list[StageCallback] = []
+
+    def report(self, stage: JobStage) -> None:
+        self.stage = stage
+        for listener in list(self.listeners):
+            listener(stage)
+
+
+class GenerationCache:
+
+    def __init__(
+        self,
+        directory: str,
+        max_memory_entries: int,
+        max_disk_bytes: int,
+        ttl_seconds: float,
+        is_valid: Callable[[LlmAgentResponse], bool] | None = None,
+    ):
+        self.directory = Path(directory)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        # Confere uma entrada antes de servi-la (ex.: a imagem ainda existe); inválida vira miss
+        self.is_valid = is_valid or (lambda response: True)
+        self._memory: OrderedDict[str, tuple[float, LlmAgentResponse]] = OrderedDict()
+        self._in_flight: dict[str, _InFlightLoad] = {}
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+        }
+
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[StageCallback], Awaitable[LlmAgentResponse]],
+        on_stage: StageCallback | None = None,
+    ) -> LlmAgentResponse:
+        cached = self._get_memory(key)
+        if cached is not None:
+            self.stats["memory_hits"] += 1
+            return cached
+
+        # Requisições idênticas simultâneas aguardam a mesma chamada ao modelo
+        load = self._in_flight.get(key)
+        if load is not None:
+            self.stats["coalesced"] += 1
+        else:
+            load = _InFlightLoad()
+            load.task = asyncio.create_task(self._load(key, factory, load.report))
+            self._in_flight[key] = load
+            load.task.add_done_callback(lambda t: self._on_load_done(key, t))
+
+        if on_stage is not None:
+            # Quem chega no meio da chamada recebe o estágio atual antes dos próximos
+            if load.stage is not None:
+                on_stage(load.stage)
+            load.listeners.append(on_stage)
+        try:
+            # shield: se quem iniciou a chamada desconectar, os demais continuam esperando
+            return await asyncio.shield(load.task)
+        finally:
+            if on_stage is not None:
+                load.listeners.remove(on_stage)
+
+    async def contains(self, key: str) -> bool:
+        if self._get_memory(key) is not None or key in self._in_flight:
+            return True
+        return await asyncio.to_thread(self._read_disk, key) is not None
+
+    async def _load(
+        self,
+        key: str,
+        factory: Callable[[StageCallback], Awaitable[LlmAgentResponse]],
+        report: StageCallback,
+    ) -> LlmAgentResponse:
+        cached = await asyncio.to_thread(self._read_disk, key)
+        if cached is not None:
+            self.stats["disk_hits"] += 1
+            # Mantém a data de criação do arquivo: a entrada não ganha um TTL novo na memória
+            created_at, response = cached
+            self._put_memory(key, response, created_at)
+            return response
+
+        self.stats["misses"] += 1
+        response = await factory(report)
+        # Resposta de um modelo de fallback, ou sem imagem (só texto, bloqueio de segurança),
+        # atende este pedido mas não fica no cache: o próximo pedido tenta de novo
+        if (
+            response.status == "success"
+            and response.data.get("image_hash")
+            and not response.payload.get("fallback")
+        ):
+            self._put_memory(key, response)
+            try:
+                await asyncio.to_thread(self._write_disk, key, response)
+            except OSError as e:
+                # Falha no disco (cheio, permissão) não deve derrubar uma geração já paga
+                logger.warning("Could not write generation cache entry %s: %s", key, e)
+        return response
+
+    def _on_load_done(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        # Evita "Task exception was never retrieved" quando ninguém mais espera
+        if not task.cancelled():
+            task.exception()
+
+    def _get_memory(self, key: str) -> LlmAgentResponse | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created_at, response = entry
+        if time.time() - created_at > self.ttl_seconds or not self.is_valid(response):
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return response
+
+    def _put_memory(self, key: str, response: LlmAgentResponse, created_at: float | None = None) -> None:
+        self._memory[key] = (time.time() if created_at is None else created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read_disk(self, key: str) -> tuple[float, LlmAgentResponse] | None:
+        path = self._disk_path(key)
+        try:
+            created_at = path.stat().st_mtime
+            if time.time() - created_at > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            response = LlmAgentResponse.model_validate_json(path.read_bytes())
+            if not self.is_valid(response):
+                path.unlink(missing_ok=True)
+                return None
+            return created_at, response
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, response: LlmAgentResponse) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._disk_path(key)
+        # Nome temporário único: vários workers podem gravar a mesma chave ao mesmo tempo
+        tmp_path = self.directory / f".{uuid.uuid4().hex}.tmp"
+        try:
+            tmp_path.write_text(response.model_dump_json(), encoding="utf-8")
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Remove os mais antigos até caber no limite de tamanho
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "in_flight": len(self._in_flight),
+        }
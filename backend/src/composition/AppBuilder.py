@@ -0,0 +1,175 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from core.interfaces.LllmAgentInterface import LlmAgentInterface
+from services.isometric_service import IsometricService
+from src.cache.GenerationCache import GenerationCache
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimiter, ConcurrencyLimitExceeded
+from src.config.AgentConfig import agent_config, fake_agent_config, routing_config
+from src.config.CityConfig import city_config
+from src.config.GenerationConfig import (
+    batch_config,
+    cache_config,
+    concurrency_config,
+    image_store_config,
+    job_config,
+)
+from src.handlers.ImageGenerationHandler import ImageGenerationHandler
+from src.jobs.JobManager import JobManager
+from src.LlmAgents.fake.FakeImageAgent import FakeImageAgent
+from src.LlmAgents.gemini.GeminiConfig import gemini_config
+from src.LlmAgents.gemini.GeminiImageAgent import GeminiImageAgent
+from src.LlmAgents.routing.RoutingAgent import RoutingAgent
+from src.LlmAgents.wrappers.ConcurrencyLimitedAgent import ConcurrencyLimitedAgent
+from src.LlmAgents.wrappers.RateLimitedAgent import RateLimitedAgent
+from src.scheduling.BatchScheduler import BatchScheduler
+from src.scheduling.TokenBucket import TokenBucket
+from src.storage.ImageStore import ImageStore
+
+# Monta os objetos de longa duração usados no lifespan da aplicação (main.py)
+
+# Limitador compartilhado por todas as requisições do processo
+generation_limiter = ConcurrencyLimiter(
+    max_concurrent=concurrency_config["max_concurrent"],
+    max_queued=concurrency_config["max_queued"],
+    queue_timeout=concurrency_config["queue_timeout"],
+    retry_after=concurrency_config["retry_after"],
+)
+
+
+def build_routing_agent(routes: list[tuple[str, LlmAgentInterface]]) -> RoutingAgent:
+    return RoutingAgent(
+        routes=routes,
+        attempt_timeout=routing_config["attempt_timeout"],
+        hedge_enabled=routing_config["hedge_enabled"],
+        hedge_percentile=routing_config["hedge_percentile"],
+        hedge_min_samples=routing_config["hedge_min_samples"],
+        hedge_default_delay=routing_config["hedge_default_delay"],
+        latency_window=routing_config["latency_window"],
+    )
+
+
+def build_base_llm_agent() -> LlmAgentInterface:
+    agent_type = agent_config["agent_type"]
+    api_key = agent_config["api_key"]
+    if agent_type == "gemini":
+        if not routing_config["enabled"]:
+            return GeminiImageAgent(api_key=api_key)
+        model_names = [gemini_config["model_name"], *gemini_config["fallback_model_names"]]
+        return build_routing_agent([
+            (model_name, GeminiImageAgent(api_key=api_key, model_name=model_name))
+            for model_name in model_names
+        ])
+    if agent_type == "fake":
+        return FakeImageAgent(**fake_agent_config)
+    raise ValueError(f"Unknown AGENT_TYPE: {agent_type}")
+
+
+# O roteador pode disparar hedges e fallbacks para um mesmo pedido: os limites valem
+# para cada chamada real ao modelo, não para o pedido lógico
+def build_llm_agent() -> LlmAgentInterface:
+    agent = build_base_llm_agent()
+    if isinstance(agent, RoutingAgent):
+        return agent.with_call_slot(generation_limiter.acquire, generation_limiter.has_free_slot)
+    return ConcurrencyLimitedAgent(agent=agent, limiter=generation_limiter)
+
+
+# Vaga de uma chamada de lote: token da cota e depois vaga no limitador.
+# O token volta ao balde se o limitador recusar antes da chamada.
+@asynccontextmanager
+async def batch_call_slot(token_bucket: TokenBucket) -> AsyncIterator[None]:
+    await token_bucket.acquire()
+    acquired = False
+    try:
+        async with generation_limiter.acquire():
+            acquired = True
+            yield
+    except ConcurrencyLimitExceeded:
+        if not acquired:
+            token_bucket.refund()
+        raise
+
+
+def build_image_store() -> ImageStore:
+    return ImageStore(
+        directory=image_store_config["directory"],
+        max_bytes=image_store_config["max_bytes"],
+        ttl_seconds=image_store_config["ttl_seconds"],
+    )
+
+
+def build_generation_cache(image_store: ImageStore) -> GenerationCache | None:
+    if not cache_config["enabled"]:
+        return None
+    # Entradas cuja imagem saiu do ImageStore viram miss, em vez de devolver uma URL com 404
+    return GenerationCache(
+        directory=cache_config["directory"],
+        max_memory_entries=cache_config["max_memory_entries"],
+        max_disk_bytes=cache_config["max_disk_bytes"],
+        ttl_seconds=cache_config["ttl_seconds"],
+        is_valid=lambda response: image_store.exists(response.data.get("image_hash", "")),
+    )
+
+
+def build_job_manager(handler: ImageGenerationHandler) -> JobManager:
+    return JobManager(
+        handler=handler,
+        workers=job_config["workers"],
+        max_queued=job_config["max_queued"],
+        result_ttl=job_config["result_ttl"],
+        retry_after=concurrency_config["retry_after"],
+    )
+
+
+def build_batch_scheduler(
+    llm_agent: LlmAgentInterface,
+    image_store: ImageStore,
+    generation_cache: GenerationCache | None,
+) -> BatchScheduler:
+    # Só chamadas reais ao modelo consomem tokens; acertos de cache passam direto.
+    # O token é pego antes da vaga no limitador e devolvido se o limitador recusar.
+    token_bucket = TokenBucket(
+        requests_per_minute=batch_config["requests_per_minute"],
+        burst=batch_config["burst"],
+    )
+    if isinstance(llm_agent, RoutingAgent):
+        rate_limited_agent = llm_agent.with_call_slot(
+            lambda: batch_call_slot(token_bucket),
+            generation_limiter.has_free_slot,
+        )
+    else:
+        rate_limited_agent = RateLimitedAgent(agent=llm_agent, token_bucket=token_bucket)
+    return BatchScheduler(
+        handler=ImageGenerationHandler(
+            image_generation_agent=rate_limited_agent,
+            image_store=image_store,
+            generation_cache=generation_cache,
+        ),
+        max_concurrency=batch_config["max_concurrency"],
+        max_attempts=batch_config["max_attempts"],
+        retry_initial_wait=batch_config["retry_initial_wait"],
+        retry_max_wait=batch_config["retry_max_wait"],
+    )
+
+
+def build_isometric_service(
+    handler: ImageGenerationHandler,
+    job_manager: JobManager,
+) -> IsometricService:
+    def is_upstream_idle() -> bool:
+        return (
+            generation_limiter.in_flight == 0
+            and generation_limiter.queued == 0
+            and job_manager.queued() == 0
+        )
+
+    return IsometricService(
+        handler=handler,
+        stats_path=city_config["stats_path"],
+        max_tracked_cities=city_config["max_tracked_cities"],
+        prerender_enabled=city_config["prerender_enabled"],
+        prerender_top_n=city_config["prerender_top_n"],
+        prerender_min_requests=city_config["prerender_min_requests"],
+        prerender_budget_per_day=city_config["prerender_budget_per_day"],
+        prerender_interval=city_config["prerender_interval"],
+        is_upstream_idle=is_upstream_idle,
+    )
@@ -0,0 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class ConcurrencyLimitExceeded(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        queue_timeout: float,
+        retry_after: int,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.queued = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def has_free_slot(self) -> bool:
+        return self.in_flight < self.max_concurrent and self.queued == 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        # Falha rápido quando todos os slots estão ocupados e a fila está cheia
+        if self.in_flight + self.queued >= self.max_concurrent + self.max_queued:
+            raise ConcurrencyLimitExceeded(
+                "Too many generations in progress, try again later.",
+                retry_after=self.retry_after,
+            )
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ConcurrencyLimitExceeded(
+                "Timed out waiting for a free generation slot.",
+                retry_after=self.retry_after,
+            )
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
@@ -0,0 +1,32 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_agent_type = os.getenv("AGENT_TYPE", "gemini")
+
+# Qual agente atende as gerações (gemini ou fake)
+agent_config = {
+    "agent_type": _agent_type.lower(),
+    "api_key": os.getenv(f"{_agent_type.upper()}_API_KEY"),
+}
+
+# AGENT_TYPE=fake: agente local com latência simulada, para testes de carga
+fake_agent_config = {
+    "latency_seconds": float(os.getenv("FAKE_AGENT_LATENCY", "0")),
+    "latency_jitter": float(os.getenv("FAKE_AGENT_LATENCY_JITTER", "0")),
+    "latency_sigma": float(os.getenv("FAKE_AGENT_LATENCY_SIGMA", "0")),
+    "error_rate": float(os.getenv("FAKE_AGENT_ERROR_RATE", "0")),
+    "image_size_bytes": int(os.getenv("FAKE_AGENT_IMAGE_BYTES", "0")),
+}
+
+# Roteamento entre modelos: prazo por tentativa, hedging e fallback
+routing_config = {
+    "enabled": os.getenv("ROUTING_ENABLED", "true").lower() == "true",
+    "attempt_timeout": float(os.getenv("ROUTING_ATTEMPT_TIMEOUT", "60")),
+    "hedge_enabled": os.getenv("HEDGE_ENABLED", "true").lower() == "true",
+    "hedge_percentile": float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+    "hedge_min_samples": int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+    "hedge_default_delay": float(os.getenv("HEDGE_DEFAULT_DELAY", "30")),
+    "latency_window": int(os.getenv("ROUTING_LATENCY_WINDOW", "200")),
+}
@@ -0,0 +1,16 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Estatísticas de pedidos por cidade e pré-renderização das mais populares
+city_config = {
+    "stats_path": os.getenv("CITY_STATS_PATH", ".cache/city_stats.json"),
+    "popular_limit": int(os.getenv("POPULAR_CITIES_LIMIT", "20")),
+    "max_tracked_cities": int(os.getenv("CITY_STATS_MAX_CITIES", "1000")),
+    "prerender_enabled": os.getenv("PRERENDER_ENABLED", "true").lower() == "true",
+    "prerender_top_n": int(os.getenv("PRERENDER_TOP_N", "20")),
+    "prerender_min_requests": int(os.getenv("PRERENDER_MIN_REQUESTS", "3")),
+    "prerender_budget_per_day": int(os.getenv("PRERENDER_BUDGET_PER_DAY", "50")),
+    "prerender_interval": float(os.getenv("PRERENDER_INTERVAL", "60")),
+}
@@ -0,0 +1,44 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Limite de gerações simultâneas e fila de espera (acima disso, 503 + Retry-After)
+concurrency_config = {
+    "max_concurrent": int(os.getenv("MAX_CONCURRENT_GENERATIONS", "4")),
+    "max_queued": int(os.getenv("MAX_QUEUED_GENERATIONS", "16")),
+    "queue_timeout": float(os.getenv("GENERATION_QUEUE_TIMEOUT", "30")),
+    "retry_after": int(os.getenv("GENERATION_RETRY_AFTER", "10")),
+}
+
+# O TTL padrão das imagens acompanha o do cache de gerações que aponta para elas
+image_store_config = {
+    "directory": os.getenv("IMAGE_STORE_DIR", "logos"),
+    "max_bytes": int(os.getenv("IMAGE_STORE_MAX_BYTES", str(2 * 1024 ** 3))),
+    "ttl_seconds": float(os.getenv("IMAGE_STORE_TTL", os.getenv("GENERATION_CACHE_TTL", str(7 * 24 * 3600)))),
+}
+
+cache_config = {
+    "enabled": os.getenv("GENERATION_CACHE_ENABLED", "true").lower() == "true",
+    "directory": os.getenv("GENERATION_CACHE_DIR", ".cache/generations"),
+    "max_memory_entries": int(os.getenv("GENERATION_CACHE_MEMORY_ENTRIES", "64")),
+    "max_disk_bytes": int(os.getenv("GENERATION_CACHE_MAX_DISK_BYTES", str(500 * 1024 * 1024))),
+    "ttl_seconds": float(os.getenv("GENERATION_CACHE_TTL", str(7 * 24 * 3600))),
+}
+
+job_config = {
+    "workers": int(os.getenv("JOB_WORKERS", str(concurrency_config["max_concurrent"]))),
+    "max_queued": int(os.getenv("JOB_QUEUE_MAX", "100")),
+    "result_ttl": float(os.getenv("JOB_RESULT_TTL", "600")),
+}
+
+# Cota do provedor usada pelo agendador de lotes
+batch_config = {
+    "max_items": int(os.getenv("BATCH_MAX_ITEMS", "500")),
+    "requests_per_minute": float(os.getenv("BATCH_REQUESTS_PER_MINUTE", "10")),
+    "burst": int(os.getenv("BATCH_BURST", "2")),
+    "max_concurrency": int(os.getenv("BATCH_MAX_CONCURRENCY", "2")),
+    "max_attempts": int(os.getenv("BATCH_MAX_ATTEMPTS", "5")),
+    "retry_initial_wait": float(os.getenv("BATCH_RETRY_INITIAL_WAIT", "1")),
+    "retry_max_wait": float(os.getenv("BATCH_RETRY_MAX_WAIT", "60")),
+}
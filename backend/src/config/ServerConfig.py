@@ -0,0 +1,11 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+server_config = {
+    # Header Server-Timing com a duração de cada estágio da requisição
+    "server_timing_enabled": os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true",
+    # Intervalo de amostragem do atraso do event loop
+    "event_loop_lag_interval": float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.1")),
+}
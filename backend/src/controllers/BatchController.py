@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from core.schemas.BatchRequest import BatchRequest
+from core.schemas.BatchSummary import BatchSummary
+from services.isometric_service import IsometricService
+from src.config.GenerationConfig import batch_config
+from src.controllers.CityController import isometric_service_factory
+from src.scheduling.BatchScheduler import BatchScheduler
+
+router = APIRouter()
+
+# O BatchScheduler é criado uma única vez no lifespan da aplicação (main.py)
+def batch_scheduler_factory(request: Request) -> BatchScheduler:
+    return request.app.state.batch_scheduler
+
+
+# Resultados parciais em NDJSON: uma linha por item concluído e o resumo no final
+@router.post("/batches")
+async def run_batch(
+    request: BatchRequest,
+    batch_scheduler: BatchScheduler = Depends(batch_scheduler_factory),
+    isometric_service: IsometricService = Depends(isometric_service_factory),
+):
+    if len(request.prompts) + len(request.cities) > batch_config["max_items"]:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: at most {batch_config['max_items']} items",
+        )
+
+    # Cidades usam o template do IsometricService; a ordem dos itens é prompts e depois cidades
+    try:
+        prompts = request.prompts + [isometric_service.build_prompt(city) for city in request.cities]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def result_stream():
+        async for result in batch_scheduler.run(prompts):
+            kind = "summary" if isinstance(result, BatchSummary) else "item"
+            yield f'{{"type": "{kind}", "result": {result.model_dump_json()}}}\n'
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from core.schemas.CityRequest import CityRequest
+from core.schemas.Job import Job
+from core.schemas.UserRequest import UserRequest
+from core.schemas.UserResponse import UserResponse
+from services.isometric_service import IsometricService
+from src.config.CityConfig import city_config
+from src.controllers.ImageGenerationController import generate_image, image_generation_handler_factory
+from src.controllers.JobController import create_job, job_manager_factory
+from src.handlers.ImageGenerationHandler import ImageGenerationHandler
+from src.jobs.JobManager import JobManager
+
+router = APIRouter()
+
+# O IsometricService é criado uma única vez no lifespan da aplicação (main.py)
+def isometric_service_factory(request: Request) -> IsometricService:
+    return request.app.state.isometric_service
+
+
+def city_prompt_request(city: str, isometric_service: IsometricService) -> UserRequest:
+    try:
+        isometric_service.record_request(city)
+        return UserRequest(prompt=isometric_service.build_prompt(city))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+# Mesmo fluxo de /generate-image e /jobs, mas com o prompt montado no servidor
+@router.post("/cities/generate-image", response_model=UserResponse)
+async def generate_city_image(
+    request: CityRequest,
+    isometric_service: IsometricService = Depends(isometric_service_factory),
+    image_generation_handler: ImageGenerationHandler = Depends(image_generation_handler_factory),
+) -> Response:
+    return await generate_image(
+        city_prompt_request(request.city, isometric_service),
+        image_generation_handler,
+    )
+
+
+@router.post("/cities/jobs", response_model=Job, status_code=202)
+async def create_city_job(
+    request: CityRequest,
+    isometric_service: IsometricService = Depends(isometric_service_factory),
+    job_manager: JobManager = Depends(job_manager_factory),
+) -> Job:
+    return await create_job(
+        city_prompt_request(request.city, isometric_service),
+        job_manager,
+    )
+
+
+@router.get("/cities/popular")
+async def popular_cities(
+    isometric_service: IsometricService = Depends(isometric_service_factory),
+):
+    return {"cities": isometric_service.popular_cities(city_config["popular_limit"])}
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from src.storage.ImageStore import ImageStore
+from src.controllers.ImageGenerationController import image_store_factory
+
+router = APIRouter()
+
+# O nome do arquivo é o hash do conteúdo, então a imagem nunca muda
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/images/{image_hash}")
+def get_image(
+    image_hash: str,
+    request: Request,
+    image_store: ImageStore = Depends(image_store_factory),
+):
+    found = image_store.find(image_hash)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    path, mime_type = found
+
+    etag = f'"{image_hash}"'
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+
+    # If-None-Match usa comparação fraca: W/"<hash>" também casa com a ETag
+    if_none_match = request.headers.get("if-none-match", "")
+    client_tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if etag in client_tags or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type=mime_type, headers=headers)
@@ -1,30 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
-import os
-from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from core.schemas.UserRequest import UserRequest
 from core.schemas.UserResponse import UserResponse
-from core.schemas.LlmAgentConfig import LlmAgentConfig
 from core.interfaces.LllmAgentInterface import LlmAgentInterface
 from src.handlers.ImageGenerationHandler import ImageGenerationHandler
-from src.LlmAgents.gemini.GeminiImageAgent import GeminiImageAgent
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimitExceeded
+from src.cache.GenerationCache import GenerationCache
+from src.storage.ImageStore import ImageStore
+from src.metrics.Metrics import span, record_since_request_start
 
 router = APIRouter()
 
-load_dotenv()
 
-AGENT_TYPE = os.getenv("AGENT_TYPE", "gemini")
-API_KEY = os.getenv(f"{AGENT_TYPE.upper()}_API_KEY")
+# Agente, cache e armazenamento de imagens são criados uma única vez no lifespan da aplicação (main.py)
+def llm_agent_factory(request: Request) -> LlmAgentInterface:
+    return request.app.state.llm_agent
 
-def llm_agent_factory() -> LlmAgentInterface:
-    if AGENT_TYPE.lower() == "gemini":
-        return GeminiImageAgent(api_key=API_KEY)
-    raise ValueError(f"Unknown AGENT_TYPE: {AGENT_TYPE}")
+
+def generation_cache_factory(request: Request) -> GenerationCache | None:
+    return request.app.state.generation_cache
+
+
+def image_store_factory(request: Request) -> ImageStore:
+    return request.app.state.image_store
 
 
 def image_generation_handler_factory(
-    llm_agent: LlmAgentInterface = Depends(llm_agent_factory)
+    llm_agent: LlmAgentInterface = Depends(llm_agent_factory),
+    image_store: ImageStore = Depends(image_store_factory),
+    generation_cache: GenerationCache | None = Depends(generation_cache_factory),
 ) -> ImageGenerationHandler:
-    return ImageGenerationHandler(image_generation_agent=llm_agent)
+    return ImageGenerationHandler(
+        image_generation_agent=llm_agent,
+        image_store=image_store,
+        generation_cache=generation_cache,
+    )
 
 
 @router.post("/generate-image", response_model=UserResponse)
@@ -32,14 +41,27 @@ async def generate_image(
     request: UserRequest, 
     image_generation_handler: ImageGenerationHandler = Depends(image_generation_handler_factory)
 ) -> UserResponse:
+    record_since_request_start("request_parsing")
     try:
-        return await image_generation_handler.generate_image(request)
+        with span("handler_dispatch"):
+            result = await image_generation_handler.generate_image(request)
+    except ConcurrencyLimitExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error generating image: {str(e)}"
         )
 
+    # Serializa aqui para medir o custo; o Response pronto dispensa a serialização do FastAPI
+    with span("response_serialization"):
+        body = result.model_dump_json()
+    return Response(content=body, media_type="application/json")
+
 
 @router.get("/")
 def read_root():
@@ -49,3 +71,12 @@ def read_root():
 @router.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@router.get("/cache/stats")
+def cache_stats(
+    generation_cache: GenerationCache | None = Depends(generation_cache_factory)
+):
+    if generation_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **generation_cache.get_stats()}
@@ -0,0 +1,92 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from core.schemas.Job import Job
+from core.schemas.UserRequest import UserRequest
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimitExceeded
+from src.jobs.JobManager import JobManager
+
+router = APIRouter()
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+# O JobManager é criado uma única vez no lifespan da aplicação (main.py)
+def job_manager_factory(request: Request) -> JobManager:
+    return request.app.state.job_manager
+
+
+def get_job_or_404(job_id: str, job_manager: JobManager) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs", response_model=Job, status_code=202)
+async def create_job(
+    request: UserRequest,
+    job_manager: JobManager = Depends(job_manager_factory),
+) -> Job:
+    try:
+        return job_manager.submit(request)
+    except ConcurrencyLimitExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    job_manager: JobManager = Depends(job_manager_factory),
+) -> Job:
+    return get_job_or_404(job_id, job_manager)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    job_manager: JobManager = Depends(job_manager_factory),
+):
+    get_job_or_404(job_id, job_manager)
+
+    async def event_stream():
+        with job_manager.subscribe(job_id) as events:
+            while True:
+                try:
+                    job = await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {job.stage.value}\ndata: {job.model_dump_json()}\n\n"
+                if job.finished:
+                    return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/jobs/{job_id}/ws")
+async def job_events_websocket(websocket: WebSocket, job_id: str):
+    job_manager: JobManager = websocket.app.state.job_manager
+    if job_manager.get(job_id) is None:
+        await websocket.close(code=4404, reason="Job not found")
+        return
+
+    await websocket.accept()
+    try:
+        with job_manager.subscribe(job_id) as events:
+            while True:
+                job = await events.get()
+                await websocket.send_text(job.model_dump_json())
+                if job.finished:
+                    break
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
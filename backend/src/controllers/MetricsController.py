@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from src.metrics.Metrics import metrics
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(content=metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
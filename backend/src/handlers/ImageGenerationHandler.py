@@ -1,16 +1,84 @@
+from typing import Callable
 from core.interfaces.LllmAgentInterface import LlmAgentInterface
+from core.schemas.Job import JobStage
+from core.schemas.LlmAgentResponse import LlmAgentResponse
 from core.schemas.UserRequest import UserRequest
 from core.schemas.UserResponse import UserResponse
+from src.cache.GenerationCache import GenerationCache, generation_cache_key
+from src.storage.ImageStore import ImageStore
+from src.metrics.Metrics import IMAGE_SIZE
 
 
 class ImageGenerationHandler:
 
-    def __init__(self, image_generation_agent: LlmAgentInterface):
+    def __init__(
+        self,
+        image_generation_agent: LlmAgentInterface,
+        image_store: ImageStore,
+        generation_cache: GenerationCache | None = None,
+    ):
         self.image_generation_agent = image_generation_agent
+        self.image_store = image_store
+        self.generation_cache = generation_cache
 
-    async def generate_image(self, request: UserRequest) -> UserResponse:
-        response = await self.image_generation_agent.generate_content(request.prompt)
+    async def generate_image(
+        self,
+        request: UserRequest,
+        on_stage: Callable[[JobStage], None] | None = None,
+    ) -> UserResponse:
+        report = on_stage or (lambda stage: None)
+        if self.generation_cache is None:
+            response = await self._generate_and_store(request.prompt, report)
+        else:
+            key = generation_cache_key(
+                request.prompt,
+                self.image_generation_agent.config_fingerprint(),
+            )
+            # Os estágios vêm da chamada compartilhada pela chave, mesmo para pedidos agrupados
+            response = await self.generation_cache.get_or_create(
+                key,
+                lambda report_stage: self._generate_and_store(request.prompt, report_stage),
+                on_stage=report,
+            )
+        # Acertos de cache não passam por nenhum estágio intermediário
+        report(JobStage.DONE)
+
+        data = dict(response.data)
+        if data.get("image_hash"):
+            data["image_url"] = f"/images/{data['image_hash']}"
         return UserResponse(
             status=response.status,
-            data=response.data
-        )
\ No newline at end of file
+            data=data
+        )
+
+    async def is_cached(self, prompt: str) -> bool:
+        if self.generation_cache is None:
+            return False
+        key = generation_cache_key(prompt, self.image_generation_agent.config_fingerprint())
+        return await self.generation_cache.contains(key)
+
+    async def _generate_and_store(
+        self,
+        prompt: str,
+        report: Callable[[JobStage], None],
+    ) -> LlmAgentResponse:
+        report(JobStage.UPSTREAM_CALL)
+        response = await self.image_generation_agent.generate_content(prompt)
+
+        # Só metadados seguem adiante (e para o cache); os bytes ficam no ImageStore
+        report(JobStage.DECODE)
+        image_bytes = response.data.get("image_bytes")
+        data = {"text": response.data.get("text")}
+        if image_bytes:
+            mime_type = response.data.get("mime_type") or "image/png"
+            report(JobStage.PERSIST)
+            IMAGE_SIZE.observe(len(image_bytes))
+            data["image_hash"] = await self.image_store.save(image_bytes, mime_type)
+            data["mime_type"] = mime_type
+            data["size_bytes"] = len(image_bytes)
+
+        return LlmAgentResponse(
+            status=response.status,
+            payload=response.payload,
+            data=data,
+        )
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+from core.schemas.Job import Job, JobStage
+from core.schemas.UserRequest import UserRequest
+from core.schemas.UserResponse import UserResponse
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimitExceeded
+from src.handlers.ImageGenerationHandler import ImageGenerationHandler
+
+logger = logging.getLogger(__name__)
+
+
+# Executa gerações em segundo plano e publica cada mudança de estágio aos inscritos.
+# O estado dos jobs vive só na memória deste processo: exige um único worker do uvicorn
+# (ver README), senão o GET /jobs/{id} pode chegar a outro worker e receber 404.
+class JobManager:
+
+    def __init__(
+        self,
+        handler: ImageGenerationHandler,
+        workers: int,
+        max_queued: int,
+        result_ttl: float,
+        retry_after: int,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.retry_after = retry_after
+        self._queue: asyncio.Queue[tuple[str, UserRequest]] = asyncio.Queue(maxsize=max_queued)
+        self._jobs: dict[str, Job] = {}
+        self._subscribers: dict[str, set[asyncio.Queue[Job]]] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, request: UserRequest) -> Job:
+        now = time.time()
+        job = Job(job_id=uuid.uuid4().hex, stage=JobStage.QUEUED, created_at=now, updated_at=now)
+        try:
+            self._queue.put_nowait((job.job_id, request))
+        except asyncio.QueueFull:
+            raise ConcurrencyLimitExceeded(
+                "Too many jobs queued, try again later.",
+                retry_after=self.retry_after,
+            )
+        self._jobs[job.job_id] = job
+        return job
+
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[asyncio.Queue[Job]]:
+        events: asyncio.Queue[Job] = asyncio.Queue()
+        # O estado atual é enviado primeiro, para quem se inscreve depois de iniciado
+        job = self._jobs.get(job_id)
+        if job is not None:
+            events.put_nowait(job)
+        subscribers = self._subscribers.setdefault(job_id, set())
+        subscribers.add(events)
+        try:
+            yield events
+        finally:
+            subscribers.discard(events)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def _publish(self, job_id: str, **changes) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job = job.model_copy(update={**changes, "updated_at": time.time()})
+        self._jobs[job_id] = job
+        for events in self._subscribers.get(job_id, ()):
+            events.put_nowait(job)
+
+    def _on_stage(self, job_id: str, stage: JobStage) -> None:
+        # DONE é publicado pelo worker junto com o resultado
+        if stage is not JobStage.DONE:
+            self._publish(job_id, stage=stage)
+
+    async def _generate(self, job_id: str, request: UserRequest) -> UserResponse:
+        # Um job aceito não falha por falta de vaga no limitador compartilhado:
+        # volta a "queued" e tenta de novo depois do Retry-After
+        while True:
+            try:
+                return await self.handler.generate_image(
+                    request,
+                    on_stage=lambda stage: self._on_stage(job_id, stage),
+                )
+            except ConcurrencyLimitExceeded as e:
+                logger.info("Job %s waiting for a generation slot: %s", job_id, e)
+                self._publish(job_id, stage=JobStage.QUEUED)
+                await asyncio.sleep(e.retry_after)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, request = await self._queue.get()
+            try:
+                result = await self._generate(job_id, request)
+                self._publish(job_id, stage=JobStage.DONE, result=result)
+            except Exception as e:
+                logger.warning("Job %s failed: %s", job_id, e)
+                self._publish(job_id, stage=JobStage.FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.result_ttl, 60))
+            now = time.time()
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished and now - job.updated_at > self.result_ttl
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
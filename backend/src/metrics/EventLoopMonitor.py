@@ -0,0 +1,28 @@
+import asyncio
+import os
+import time
+from src.metrics.Metrics import EVENT_LOOP_LAG
+
+
+# Mede o atraso do event loop: quanto um sleep curto demora além do pedido.
+# A série leva o pid, para separar os workers quando há vários (uvicorn --workers N)
+class EventLoopMonitor:
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(str(os.getpid())))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, pid: str) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - started_at - self.interval), pid=pid)
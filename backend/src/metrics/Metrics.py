@@ -0,0 +1,242 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+# Spans da requisição atual, usados no header Server-Timing
+request_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("request_timings", default=None)
+request_started_at: ContextVar[float | None] = ContextVar("request_started_at", default=None)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+DEFAULT_SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 512 * 1024, 1024 ** 2, 2 * 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# Métricas mínimas no formato texto do Prometheus. Todas as atualizações acontecem
+# na thread do event loop, então não há locks: cada observação é um acesso a dict.
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    # Para contadores mantidos em outro lugar (ex.: estatísticas do cache)
+    def set_total(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # [contagem por bucket..., soma, total]
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, series in self._series.items():
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += series[index]
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, description: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, description, label_names))
+
+    def gauge(self, name: str, description: str, label_names: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, description, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, label_names, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    # Coletores atualizam gauges a partir do estado atual, só quando /metrics é lido
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def clear_collectors(self) -> None:
+        self._collectors.clear()
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_DURATION = metrics.histogram(
+    "isoscape_stage_duration_seconds", "Duration of each request stage", ("stage",)
+)
+UPSTREAM_LATENCY = metrics.histogram(
+    "isoscape_upstream_latency_seconds", "Latency of upstream model calls", ("model",)
+)
+ERRORS = metrics.counter(
+    "isoscape_errors_total", "Errors by stage and exception type", ("stage", "type")
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "isoscape_http_request_duration_seconds", "HTTP request duration", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge(
+    "isoscape_http_requests_in_flight", "HTTP requests currently being served"
+)
+HTTP_RESPONSE_SIZE = metrics.histogram(
+    "isoscape_http_response_size_bytes", "HTTP response body size", ("route",), DEFAULT_SIZE_BUCKETS
+)
+IMAGE_SIZE = metrics.histogram(
+    "isoscape_image_size_bytes", "Size of generated images", (), DEFAULT_SIZE_BUCKETS
+)
+GENERATIONS_IN_FLIGHT = metrics.gauge(
+    "isoscape_generations_in_flight", "Upstream generations currently running"
+)
+GENERATIONS_QUEUED = metrics.gauge(
+    "isoscape_generations_queued", "Generations waiting for a concurrency slot"
+)
+JOBS_QUEUED = metrics.gauge(
+    "isoscape_jobs_queued", "Background jobs waiting for a worker"
+)
+EVENT_LOOP_LAG = metrics.histogram(
+    "isoscape_event_loop_lag_seconds", "Extra delay of a periodic sleep on the event loop", ("pid",), LOOP_LAG_BUCKETS
+)
+PRERENDERS = metrics.counter(
+    "isoscape_prerenders_total", "Background pre-renders of popular cities", ("status",)
+)
+CACHE_EVENTS = metrics.counter(
+    "isoscape_cache_events_total", "Generation cache hits, misses and coalesced requests", ("event",)
+)
+ROUTE_CALLS = metrics.counter(
+    "isoscape_route_calls_total", "Routed generations attempted on each model route", ("route",)
+)
+ROUTE_HEDGES = metrics.counter(
+    "isoscape_route_hedges_total", "Hedged duplicate requests sent to each model route", ("route",)
+)
+ROUTE_FAILURES = metrics.counter(
+    "isoscape_route_failures_total", "Routed attempts that failed or timed out", ("route",)
+)
+ROUTE_FALLBACKS = metrics.counter(
+    "isoscape_route_fallbacks_total", "Generations answered by a fallback route", ("route",)
+)
+ROUTE_HEDGE_DELAY = metrics.gauge(
+    "isoscape_route_hedge_delay_seconds", "Current delay before hedging a request on each route", ("route",)
+)
+
+
+def _record_stage(stage: str, elapsed: float) -> None:
+    STAGE_DURATION.observe(elapsed, stage=stage)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.append((stage, elapsed))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.inc(stage=stage, type=type(e).__name__)
+        raise
+    finally:
+        _record_stage(stage, time.perf_counter() - started_at)
+
+
+# Registra o tempo desde a chegada da requisição (leitura e validação do corpo)
+def record_since_request_start(stage: str) -> None:
+    started_at = request_started_at.get()
+    if started_at is not None:
+        _record_stage(stage, time.perf_counter() - started_at)
@@ -0,0 +1,63 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.metrics.Metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RESPONSE_SIZE,
+    request_started_at,
+    request_timings,
+)
+
+
+# Middleware ASGI puro (sem BaseHTTPMiddleware) para manter o custo por requisição baixo
+class MetricsMiddleware:
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        timings: list[tuple[str, float]] = []
+        timings_token = request_timings.set(timings)
+        started_token = request_started_at.set(started_at)
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    total = (time.perf_counter() - started_at) * 1000
+                    entries = [f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings]
+                    entries.append(f"total;dur={total:.1f}")
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", ", ".join(entries).encode("latin-1")),
+                    ]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Usa o template da rota (ex.: /images/{image_hash}) para evitar alta cardinalidade
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started_at,
+                method=scope["method"],
+                route=route_path,
+                status=str(status_code),
+            )
+            HTTP_RESPONSE_SIZE.observe(response_size, route=route_path)
+            request_timings.reset(timings_token)
+            request_started_at.reset(started_token)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import AsyncIterator
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from core.schemas.BatchItemResult import BatchItemResult
+from core.schemas.BatchSummary import BatchSummary
+from core.schemas.UserRequest import UserRequest
+from src.concurrency.ConcurrencyLimiter import ConcurrencyLimitExceeded
+from src.handlers.ImageGenerationHandler import ImageGenerationHandler
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    if isinstance(error, (ConcurrencyLimitExceeded, asyncio.TimeoutError)):
+        return True
+    # google.genai.errors.APIError expõe o status HTTP em `code`
+    status_code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+class BatchScheduler:
+
+    def __init__(
+        self,
+        handler: ImageGenerationHandler,
+        max_concurrency: int,
+        max_attempts: int,
+        retry_initial_wait: float,
+        retry_max_wait: float,
+    ):
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.retry_initial_wait = retry_initial_wait
+        self.retry_max_wait = retry_max_wait
+
+    async def run(self, prompts: list[str]) -> AsyncIterator[BatchItemResult | BatchSummary]:
+        # Emite cada item assim que termina e, por último, o resumo do lote
+        started_at = time.monotonic()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_with_slot(index: int, prompt: str) -> BatchItemResult:
+            async with semaphore:
+                return await self._run_item(index, prompt)
+
+        tasks = [
+            asyncio.create_task(run_with_slot(index, prompt))
+            for index, prompt in enumerate(prompts)
+        ]
+        succeeded = failed = attempts = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                attempts += result.attempts
+                if result.status == "success":
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        elapsed = time.monotonic() - started_at
+        yield BatchSummary(
+            total=len(prompts),
+            succeeded=succeeded,
+            failed=failed,
+            attempts=attempts,
+            elapsed_seconds=round(elapsed, 3),
+            items_per_minute=round(len(prompts) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        )
+
+    async def _run_item(self, index: int, prompt: str) -> BatchItemResult:
+        started_at = time.monotonic()
+        attempts = 0
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.max_attempts),
+                wait=wait_exponential_jitter(initial=self.retry_initial_wait, max=self.retry_max_wait),
+                retry=retry_if_exception(is_retryable_error),
+                reraise=True,
+            ):
+                with attempt:
+                    attempts += 1
+                    response = await self.handler.generate_image(UserRequest(prompt=prompt))
+        except Exception as e:
+            # Falha de um item não interrompe o restante do lote
+            return BatchItemResult(
+                index=index,
+                status="error",
+                attempts=attempts,
+                latency_seconds=round(time.monotonic() - started_at, 3),
+                error=str(e),
+            )
+
+        return BatchItemResult(
+            index=index,
+            status=response.status,
+            attempts=attempts,
+            latency_seconds=round(time.monotonic() - started_at, 3),
+            data=response.data,
+        )
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+
+# Limita a taxa de chamadas ao modelo à cota do provedor (requisições/minuto)
+class TokenBucket:
+
+    def __init__(self, requests_per_minute: float, burst: int):
+        self.rate_per_second = requests_per_minute / 60
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        # O lock garante que os pedidos são atendidos na ordem de chegada
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+                self._refill()
+            self._tokens -= 1
+
+    def refund(self) -> None:
+        # Devolve um token que não chegou a virar chamada ao modelo
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + 1)
@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from src.metrics.Metrics import span
+
+MIME_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/webp": ".webp",
+}
+
+_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+# Armazena imagens geradas pelo hash do conteúdo (sha256), uma vez por imagem.
+# Imagens mais velhas que o TTL, ou as mais antigas acima do limite de tamanho, são removidas.
+class ImageStore:
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+    async def save(self, data: bytes, mime_type: str) -> str:
+        with span("disk_write"):
+            return await asyncio.to_thread(self._save, data, mime_type)
+
+    def _save(self, data: bytes, mime_type: str) -> str:
+        image_hash = hashlib.sha256(data).hexdigest()
+        path = self.directory / f"{image_hash}{MIME_EXTENSIONS.get(mime_type, '.png')}"
+        if path.exists():
+            # Imagem gerada de novo: renova o prazo junto com a nova entrada do cache
+            os.utime(path)
+            return image_hash
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / f".{uuid.uuid4().hex}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._evict()
+        return image_hash
+
+    def _evict(self) -> None:
+        now = time.time()
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix not in MIME_EXTENSIONS.values():
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Remove as mais antigas até caber no limite de tamanho
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def exists(self, image_hash: str) -> bool:
+        return self.find(image_hash) is not None
+
+    def find(self, image_hash: str) -> tuple[Path, str] | None:
+        if not _HASH_PATTERN.match(image_hash):
+            return None
+        for mime_type, extension in MIME_EXTENSIONS.items():
+            path = self.directory / f"{image_hash}{extension}"
+            if path.is_file():
+                return path, mime_type
+        return None
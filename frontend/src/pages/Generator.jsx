@@ -5,6 +5,15 @@ import logoImage from '../../images/logo.png'
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 
+// Estágios reais reportados pelo backend (GET /jobs/{id}/events)
+const JOB_STAGES = {
+  queued: { progress: 5, label: 'Na fila' },
+  upstream_call: { progress: 25, label: 'Gerando com o modelo' },
+  decode: { progress: 80, label: 'Processando imagem' },
+  persist: { progress: 90, label: 'Salvando imagem' },
+  done: { progress: 100, label: 'Concluído' },
+}
+
 function Generator() {
   const navigate = useNavigate()
   const [city, setCity] = useState('')
@@ -13,63 +22,47 @@ function Generator() {
   const [error, setError] = useState('')
   const [currentCity, setCurrentCity] = useState('')
   const [progress, setProgress] = useState(0)
-  const [estimatedTime, setEstimatedTime] = useState(0)
-  const startTimeRef = useRef(null)
-  const progressIntervalRef = useRef(null)
+  const [stageLabel, setStageLabel] = useState('')
+  const eventSourceRef = useRef(null)
 
-  // Função para calcular progresso realista baseado no tempo decorrido
-  const calculateRealisticProgress = (elapsedSeconds) => {
-    // Estimativa de tempo total: 20 segundos
-    const totalEstimatedTime = 20
-    
-    // Curva de progresso usando função de easing (ease-out-cubic)
-    // Começa rápido e desacelera no final
-    let normalizedTime = Math.min(elapsedSeconds / totalEstimatedTime, 0.95)
-    
-    // Aplicar curva ease-out-cubic: 1 - (1 - t)^3
-    let progressValue = 1 - Math.pow(1 - normalizedTime, 3)
-    
-    // Converter para porcentagem (0-95%, nunca chega a 100% até a requisição terminar)
-    return Math.min(progressValue * 95, 95)
-  }
-
-  // Simulação de progresso durante o carregamento
+  // Fecha o stream de eventos ao sair da página
   useEffect(() => {
-    if (isLoading) {
-      setProgress(0)
-      setEstimatedTime(20) // Estimativa inicial de 20 segundos
-      startTimeRef.current = Date.now()
-      
-      progressIntervalRef.current = setInterval(() => {
-        const elapsed = (Date.now() - startTimeRef.current) / 1000
-        const newProgress = calculateRealisticProgress(elapsed)
-        setProgress(newProgress)
-        
-        // Calcular tempo estimado restante
-        if (newProgress < 95) {
-          const remainingProgress = 95 - newProgress
-          const progressRate = newProgress / elapsed
-          const estimatedRemaining = remainingProgress / (progressRate || 0.1)
-          setEstimatedTime(Math.max(1, Math.ceil(estimatedRemaining)))
-        } else {
-          setEstimatedTime(0)
+    return () => {
+      if (eventSourceRef.current) {
+        eventSourceRef.current.close()
+      }
+    }
+  }, [])
+
+  const followJob = (jobId) =>
+    new Promise((resolve, reject) => {
+      const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`)
+      eventSourceRef.current = source
+
+      const handleEvent = (event) => {
+        const job = JSON.parse(event.data)
+        const stage = JOB_STAGES[job.stage]
+        if (stage) {
+          setProgress(stage.progress)
+          setStageLabel(stage.label)
         }
-      }, 100) // Atualizar a cada 100ms para suavidade
-      
-      return () => {
-        if (progressIntervalRef.current) {
-          clearInterval(progressIntervalRef.current)
+        if (job.stage === 'done') {
+          source.close()
+          resolve(job.result)
+        } else if (job.stage === 'failed') {
+          source.close()
+          reject(new Error(job.error || 'Falha ao gerar a imagem'))
         }
       }
-    } else {
-      // Quando terminar, completar imediatamente
-      setProgress(100)
-      setEstimatedTime(0)
-      setTimeout(() => {
-        setProgress(0)
-      }, 1000)
-    }
-  }, [isLoading])
+
+      Object.keys(JOB_STAGES).concat('failed').forEach((stage) => {
+        source.addEventListener(stage, handleEvent)
+      })
+      source.onerror = () => {
+        source.close()
+        reject(new Error('Conexão com o servidor perdida'))
+      }
+    })
 
   const handleSubmit = async (event) => {
     event.preventDefault()
@@ -84,41 +77,26 @@ function Generator() {
     setError('')
     setResult(null)
     setCurrentCity(cleanCity)
+    setProgress(0)
+    setStageLabel('')
 
     try {
-      const prompt = `
-CITY = ${cleanCity}
-
-Crie uma cena isométrica em miniatura 3D no estilo cartoon, vista em ângulo de 45°, 
-representando de forma clara a cidade de [CITY]. Inclua marcos e atrações turísticas icônicas.
-
-Use texturas suaves e refinadas, com materiais PBR realistas, iluminação natural delicada 
-e sombras suaves, refletindo as condições climáticas atuais da cidade para criar uma atmosfera imersiva. 
-Mantenha a composição limpa e minimalista, com fundo em cor sólida.
-
-No topo central da imagem, coloque o título "[CITY]" em texto médio e negrito, podendo sobrepor levemente o topo das edificações.
-
-A imagem deve ter proporção quadrada, 1080 × 1080 pixels.
-`.replace(/\[CITY\]/g, cleanCity)
-      
-      const { data } = await axios.post(`${API_BASE_URL}/generate-image`, {
-        prompt: prompt,
+      // O prompt isométrico é montado no servidor (IsometricService)
+      const { data: job } = await axios.post(`${API_BASE_URL}/cities/jobs`, {
+        city: cleanCity,
       })
-      setResult(data)
-      setProgress(100)
-      setEstimatedTime(0)
+      const jobResult = await followJob(job.job_id)
+      setResult(jobResult)
     } catch (err) {
       const message = err.response?.data?.detail || err.message || 'Erro desconhecido'
       setError(message)
     } finally {
       setIsLoading(false)
-      if (progressIntervalRef.current) {
-        clearInterval(progressIntervalRef.current)
-      }
+      eventSourceRef.current = null
     }
   }
 
-  const imageBase64 = result?.data?.image_base64
+  const imageUrl = result?.data?.image_url
   const imageText = result?.data?.text
 
   return (
@@ -198,8 +176,8 @@ A imagem deve ter proporção quadrada, 1080 × 1080 pixels.
                   </p>
                   <div className="progress-stats">
                     <span className="progress-percentage">{Math.round(progress)}%</span>
-                    {estimatedTime > 0 && (
-                      <span className="progress-time">~{estimatedTime}s restantes</span>
+                    {stageLabel && (
+                      <span className="progress-time">{stageLabel}</span>
                     )}
                   </div>
                 </div>
@@ -217,7 +195,7 @@ A imagem deve ter proporção quadrada, 1080 × 1080 pixels.
               </div>
             )}
 
-            {result && imageBase64 && (
+            {result && imageUrl && (
               <div className="result-card">
                 <div className="result-header">
                   <h3>
@@ -232,7 +210,7 @@ A imagem deve ter proporção quadrada, 1080 × 1080 pixels.
                 <div className="image-wrapper">
                   <img
                     className="result-image"
-                    src={`data:image/png;base64,${imageBase64}`}
+                    src={`${API_BASE_URL}${imageUrl}`}
                     alt={`Isometric view of ${currentCity}`}
                   />
                 </div>